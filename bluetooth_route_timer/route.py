@@ -1,9 +1,54 @@
 """Position calculator module for processing RSSI data and calculating positions."""
 
-from abc import ABC, abstractmethod
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Callable, Iterator, Mapping, Sequence
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum, auto
+from functools import partial
+from heapq import heapify, heappop
+from itertools import pairwise
+from math import exp
+from operator import methodcaller
+from types import MappingProxyType
+from typing import Final
+
+NS_PER_SECOND: Final = 1_000_000_000
+
+# Readings a sensor can hold before its buffers are grown, enough for a typical race
+INITIAL_HISTORY_CAPACITY: Final = 4096
+
+# RSSI range that fits the signed byte reading buffer, as reported by the Bluetooth controller
+RSSI_MIN: Final = -128
+RSSI_MAX: Final = 127
+
+
+def _preallocated(typecode: str, capacity: int) -> array:
+    """Create a zero-filled array with room for the given number of items."""
+    return array(typecode, bytes(capacity * array(typecode).itemsize))
+
+
+def to_ns(timestamp: datetime) -> int:
+    """Convert a naive local datetime to integer nanoseconds since the epoch without float rounding.
+
+    Timestamps are converted back with from_ns as naive local datetimes, so timezone aware
+    datetimes are rejected instead of coming back as different objects.
+
+    Raises:
+        ValueError: If the datetime is timezone aware.
+    """
+    if timestamp.tzinfo is not None:
+        raise ValueError("timestamp must be a naive local datetime")
+    return int(timestamp.replace(microsecond=0).timestamp()) * NS_PER_SECOND + timestamp.microsecond * 1000
+
+
+def from_ns(timestamp_ns: int) -> datetime:
+    """Convert integer nanoseconds since the epoch back to a local datetime."""
+    seconds, remainder = divmod(timestamp_ns, NS_PER_SECOND)
+    return datetime.fromtimestamp(seconds) + timedelta(microseconds=remainder // 1000)
 
 
 class PointType(Enum):
@@ -14,49 +59,314 @@ class PointType(Enum):
     END = auto()
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Sensor:
     """Represents a Bluetooth sensor.
 
+    Sensors are compared by identity, as the same objects are shared by the route points
+    and the address lookup.
+
     Args:
         name: Semantic name of the sensor (e.g. "a_line_start_1")
         address: MAC address of the sensor
+        max_history: Number of newest readings to keep at least, None to keep all readings.
+            Older readings are dropped in chunks once twice as many have been added, so
+            between max_history and twice as many are kept.
+            The strongest reading is remembered even after it has been dropped.
     """
 
     name: str
     address: str
-    rssi_history: dict[datetime, float] = field(default_factory=dict)
+    max_history: int | None = None
+    # Readings are stored as parallel arrays of timestamps (ns) and RSSI values (dBm).
+    # RSSI is a signed byte, as reported by the Bluetooth controller.
+    # The arrays are preallocated and only the first _n items are in use.
+    _ts: array = field(default_factory=partial(_preallocated, "q", INITIAL_HISTORY_CAPACITY), init=False, repr=False)
+    _rssi: array = field(default_factory=partial(_preallocated, "b", INITIAL_HISTORY_CAPACITY), init=False, repr=False)
+    _n: int = field(default=0, init=False, repr=False)
+    # Incremented on every new reading, so derived results can be cached against it
+    _rev: int = field(default=0, init=False, repr=False)
+    _best_ts: int | None = field(default=None, init=False, repr=False)
+    _best_rssi: int = field(default=0, init=False, repr=False)
+    _listeners: list[Callable[["Sensor", int, int], bool]] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Interned addresses match the interned lookup keys by identity before comparing characters
+        self.address = sys.intern(self.address)
+
+        if self.max_history is not None:
+            if self.max_history < 1:
+                raise ValueError("max_history must be at least 1")
+            # Bounded buffers never hold more than twice max_history readings
+            capacity = 2 * self.max_history
+            if capacity < len(self._ts):
+                self._ts = _preallocated("q", capacity)
+                self._rssi = _preallocated("b", capacity)
+
+    @property
+    def rssi_history(self) -> Mapping[datetime, int]:
+        """Read-only view of RSSI readings by timestamp, built from the reading buffers."""
+        return MappingProxyType({from_ns(self._ts[i]): self._rssi[i] for i in range(self._n)})
+
+    def add_rssi(self, rssi: float, timestamp: datetime | int) -> bool:
+        """Add RSSI reading with timestamp.
+
+        The timestamp is either a naive local datetime or nanoseconds since the epoch. Readings are
+        usually added in chronological order, but older readings are inserted in place.
+        A reading with the same timestamp as an earlier one replaces it.
+
+        Returns:
+            True if the reading is a new strongest signal. For a sensor that is part of a
+            dual sensor point, this is the strongest combined signal of the point.
+
+        Raises:
+            ValueError: If the rounded RSSI is outside RSSI_MIN..RSSI_MAX.
+        """
+        timestamp_ns = timestamp if isinstance(timestamp, int) else to_ns(timestamp)
+        rssi = round(rssi)
+        # Checked before the buffers are touched, so a bad value cannot leave them half shifted
+        if not RSSI_MIN <= rssi <= RSSI_MAX:
+            raise ValueError(f"RSSI {rssi} dBm is outside the range {RSSI_MIN}..{RSSI_MAX}")
+        n = self._n
+        if n and timestamp_ns <= self._ts[n - 1]:
+            index = bisect_left(self._ts, timestamp_ns, 0, n)
+            if self._ts[index] == timestamp_ns:
+                # A reading at the same time replaces the earlier one, as in a mapping by timestamp
+                return self._replace_rssi(index, rssi)
+
+        if n == len(self._ts):
+            self._make_room()
+            n = self._n
+        if n == 0 or timestamp_ns > self._ts[n - 1]:
+            self._ts[n] = timestamp_ns
+            self._rssi[n] = rssi
+        else:
+            # Keep the buffers sorted by shifting newer readings one slot forward
+            index = bisect_left(self._ts, timestamp_ns, 0, n)
+            self._ts[index + 1 : n + 1] = self._ts[index:n]
+            self._rssi[index + 1 : n + 1] = self._rssi[index:n]
+            self._ts[index] = timestamp_ns
+            self._rssi[index] = rssi
+        self._n = n + 1
+        self._rev += 1
+
+        # Keep track of the strongest reading so it never has to be searched for
+        is_strongest = self._best_ts is None or rssi > self._best_rssi
+        if is_strongest:
+            self._best_ts = timestamp_ns
+            self._best_rssi = rssi
+
+        if self._listeners:
+            is_strongest = self._notify_listeners(timestamp_ns, rssi)
+
+        return is_strongest
+
+    def _replace_rssi(self, index: int, rssi: int) -> bool:
+        """Replace the RSSI of an existing reading.
+
+        Returns:
+            True if the new value is a new strongest signal, see add_rssi.
+        """
+        timestamp_ns = self._ts[index]
+        previous_rssi = self._rssi[index]
+        self._rssi[index] = rssi
+        self._rev += 1
+
+        is_strongest = rssi > self._best_rssi
+        if is_strongest:
+            self._best_ts = timestamp_ns
+            self._best_rssi = rssi
+        elif timestamp_ns == self._best_ts and rssi < previous_rssi:
+            # The strongest reading got weaker, so search the kept readings again.
+            # On equal strength the earliest reading is kept, as when adding readings.
+            best_index = max(range(self._n), key=self._rssi.__getitem__)
+            self._best_ts = self._ts[best_index]
+            self._best_rssi = self._rssi[best_index]
+
+        if self._listeners:
+            is_strongest = self._notify_listeners(timestamp_ns, rssi)
+
+        return is_strongest
+
+    def _notify_listeners(self, timestamp_ns: int, rssi: int) -> bool:
+        """Pass a new or replaced reading to all listeners.
+
+        Returns:
+            True if the reading is a new strongest signal for any listener.
+        """
+        is_strongest = False
+        for listener in self._listeners:
+            is_strongest = listener(self, timestamp_ns, rssi) or is_strongest
+        return is_strongest
+
+    def add_rssi_bulk(self, timestamps_ns: Sequence[int], rssis: Sequence[float]) -> bool:
+        """Add several RSSI readings with timestamps in nanoseconds since the epoch.
+
+        Readings that continue the history in strictly chronological order are copied into
+        the buffers at once, other readings are added one at a time as with add_rssi.
+
+        Returns:
+            True if any of the readings is a new strongest signal.
+        """
+        count = len(timestamps_ns)
+        if count != len(rssis):
+            raise ValueError("timestamps_ns and rssis must have the same length")
+        if count == 0:
+            return False
+        rounded = [round(rssi) for rssi in rssis]
+        if min(rounded) < RSSI_MIN or max(rounded) > RSSI_MAX:
+            raise ValueError(f"RSSI values must be in the range {RSSI_MIN}..{RSSI_MAX}")
+
+        n = self._n
+        # Readings with repeated timestamps replace earlier ones, which add_rssi takes care of
+        in_order = (n == 0 or timestamps_ns[0] > self._ts[n - 1]) and all(
+            previous < current for previous, current in pairwise(timestamps_ns)
+        )
+        if in_order and n + count > len(self._ts) and self.max_history is None:
+            # Grow once for the whole batch instead of doubling reading by reading
+            self._grow(n + count)
+        if not in_order or n + count > len(self._ts):
+            is_strongest = False
+            for timestamp_ns, rssi in zip(timestamps_ns, rounded, strict=True):
+                is_strongest = self.add_rssi(rssi, timestamp_ns) or is_strongest
+            return is_strongest
+
+        self._ts[n : n + count] = array(self._ts.typecode, timestamps_ns)
+        self._rssi[n : n + count] = array(self._rssi.typecode, rounded)
+        self._n = n + count
+        self._rev += 1
+
+        is_strongest = False
+        for timestamp_ns, rssi in zip(timestamps_ns, rounded, strict=True):
+            if self._best_ts is None or rssi > self._best_rssi:
+                self._best_ts = timestamp_ns
+                self._best_rssi = rssi
+                is_strongest = True
+
+        if self._listeners:
+            is_strongest = False
+            for timestamp_ns, rssi in zip(timestamps_ns, rounded, strict=True):
+                is_strongest = self._notify_listeners(timestamp_ns, rssi) or is_strongest
+
+        return is_strongest
+
+    def _make_room(self) -> None:
+        """Make room in the full reading buffers by dropping old readings or growing the buffers."""
+        capacity = len(self._ts)
+        if self.max_history is not None and capacity == 2 * self.max_history:
+            # Move the newest readings to the front, so the buffers stay in chronological order
+            start = self._n - self.max_history
+            self._ts[: self.max_history] = self._ts[start : self._n]
+            self._rssi[: self.max_history] = self._rssi[start : self._n]
+            self._n = self.max_history
+        else:
+            self._grow(capacity + 1)
+
+    def _grow(self, min_capacity: int) -> None:
+        """Double the capacity of the reading buffers until min_capacity readings fit.
+
+        Bounded buffers grow up to twice max_history at most.
+        """
+        capacity = len(self._ts)
+        new_capacity = 2 * capacity
+        while new_capacity < min_capacity:
+            new_capacity *= 2
+        if self.max_history is not None:
+            new_capacity = min(new_capacity, 2 * self.max_history)
+        extra = new_capacity - capacity
+        self._ts.frombytes(bytes(extra * self._ts.itemsize))
+        self._rssi.frombytes(bytes(extra * self._rssi.itemsize))
+
+    def add_rssi_now(self, rssi: float) -> bool:
+        """Add RSSI reading with the current time as timestamp.
+
+        Returns:
+            True if the reading is a new strongest signal, see add_rssi.
+        """
+        # Nanoseconds since the epoch, as from the scanner, without building a datetime
+        return self.add_rssi(rssi, time.time_ns())
+
+    def add_listener(self, listener: Callable[["Sensor", int, int], bool]) -> None:
+        """Register a callback that is called with the sensor, timestamp (ns) and RSSI of each new reading.
+
+        A reading that replaces an earlier one at the same timestamp is passed on as well.
+        The callback returns whether the reading is a new strongest signal for the listener.
+        """
+        self._listeners.append(listener)
+
+    def get_rssi_at(self, timestamp_ns: int) -> int | None:
+        """Get the RSSI reading recorded at the given timestamp (ns), if any."""
+        index = bisect_left(self._ts, timestamp_ns, 0, self._n)
+        if index < self._n and self._ts[index] == timestamp_ns:
+            return self._rssi[index]
+        return None
+
+    def smoothed_rssi(self, tau_s: float) -> array:
+        """Get the RSSI readings smoothed with a time aware exponential filter.
 
-    def add_rssi(self, rssi: float, timestamp: datetime | None = None) -> None:
-        """Add RSSI reading with timestamp."""
-        self.rssi_history[timestamp or datetime.now()] = rssi
+        Each reading is weighted against the previous smoothed value by the time between them,
+        so readings that arrive close together are smoothed more than readings far apart.
+
+        Args:
+            tau_s: Time constant of the filter in seconds
+
+        Returns:
+            Smoothed RSSI values in dBm, in the same order as the readings.
+        """
+        if tau_s <= 0:
+            raise ValueError("tau_s must be positive")
+
+        ts, rssi = self._ts, self._rssi
+        smoothed = array("d", bytes(self._n * array("d").itemsize))
+        if self._n == 0:
+            return smoothed
+
+        neg_inv_tau_ns = -1 / (tau_s * NS_PER_SECOND)
+        previous_ts = ts[0]
+        value = float(rssi[0])
+        smoothed[0] = value
+        for i in range(1, self._n):
+            timestamp_ns = ts[i]
+            decay = exp((timestamp_ns - previous_ts) * neg_inv_tau_ns)
+            value = value * decay + rssi[i] * (1 - decay)
+            smoothed[i] = value
+            previous_ts = timestamp_ns
+        return smoothed
 
     def has_readings(self) -> bool:
         """Check if there are any RSSI readings."""
-        return bool(self.rssi_history)
+        return self._n > 0
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SignalReading:
     """Represents a signal reading with timestamp and strength.
 
     Args:
-        timestamp: When the signal was recorded
+        timestamp_ns: When the signal was recorded, in nanoseconds since the epoch
         strength: Signal strength in dBm
     """
 
-    timestamp: datetime
+    timestamp_ns: int
     strength: float
 
+    @property
+    def timestamp(self) -> datetime:
+        """When the signal was recorded."""
+        return from_ns(self.timestamp_ns)
+
+
+@dataclass(slots=True)
+class RoutePoint:
+    """Base class for a point on the route.
 
-@dataclass
-class RoutePoint(ABC):
-    """Abstract base class for a point on the route."""
+    Subclasses implement get_strongest_signal. A plain base class is used instead of ABC
+    to keep instance checks on the fast path.
+    """
 
     type: PointType
     name: str
 
-    @abstractmethod
     def get_strongest_signal(self) -> SignalReading | None:
         """Get timestamp when the point had strongest signal.
 
@@ -64,18 +374,21 @@ class RoutePoint(ABC):
             SignalReading with timestamp and signal strength if sensors have readings,
             None otherwise.
         """
-        pass
+        raise NotImplementedError
 
     def has_sensor(self, sensor: Sensor) -> bool:
         """Check if the point has a specific sensor."""
         return False
 
 
-@dataclass
+@dataclass(slots=True)
 class RoutePointSingleSensor(RoutePoint):
     """A point on the route with a single sensor."""
 
     sensor: Sensor
+    # Strongest signal cached against the sensor revision it was computed for
+    _cache_key: int = field(default=-1, init=False, repr=False, compare=False)
+    _cache_value: SignalReading | None = field(default=None, init=False, repr=False, compare=False)
 
     def get_strongest_signal(self) -> SignalReading | None:
         """Get timestamp when the sensor had strongest signal.
@@ -84,24 +397,110 @@ class RoutePointSingleSensor(RoutePoint):
             SignalReading with timestamp and signal strength if sensor has readings,
             None otherwise.
         """
-        if not self.sensor.has_readings():
-            return None
+        cache_key = self.sensor._rev
+        if cache_key == self._cache_key:
+            return self._cache_value
+
+        if self.sensor._best_ts is None:
+            signal = None
+        else:
+            signal = SignalReading(timestamp_ns=self.sensor._best_ts, strength=self.sensor._best_rssi)
 
-        # Find timestamp with strongest signal
-        strongest_time = max(self.sensor.rssi_history.keys(), key=lambda t: self.sensor.rssi_history[t])
-        return SignalReading(timestamp=strongest_time, strength=self.sensor.rssi_history[strongest_time])
+        self._cache_key = cache_key
+        self._cache_value = signal
+        return signal
 
     def has_sensor(self, sensor: Sensor) -> bool:
         """Check if the point has a specific sensor."""
-        return self.sensor == sensor
+        return sensor is self.sensor
+
+
+_SIGNAL_KEY_SHIFT: Final = 16
+_SIGNAL_KEY_MASK: Final = (1 << _SIGNAL_KEY_SHIFT) - 1
 
 
-@dataclass
+def _signal_key(rssi1: int, rssi2: int) -> int:
+    """Pack combined strength and balance of two readings into a single comparable int.
+
+    The combined strength is in the high bits and the inverted imbalance in the low 16 bits,
+    so a larger key is a stronger signal, and on equal strength the more balanced one.
+    The combined strength is recovered with key >> _SIGNAL_KEY_SHIFT.
+    """
+    return ((rssi1 + rssi2) << _SIGNAL_KEY_SHIFT) | (_SIGNAL_KEY_MASK - abs(rssi1 - rssi2))
+
+
+@dataclass(slots=True)
 class RoutePointDualSensor(RoutePoint):
     """A point on the route with two sensors."""
 
     sensor1: Sensor
     sensor2: Sensor
+    # Strongest common reading as (timestamp in ns, signal key), see _signal_key
+    _common_best: tuple[int, int] | None = field(default=None, init=False, repr=False)
+    # Strongest signal cached against the sensor revisions it was computed for
+    _cache_key: tuple[int, int] = field(default=(-1, -1), init=False, repr=False, compare=False)
+    _cache_value: SignalReading | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Sensors may already have readings, so seed the cache before following new ones
+        self._common_best = self._find_common_best()
+        self.sensor1.add_listener(self._on_reading)
+        self.sensor2.add_listener(self._on_reading)
+
+    def _find_common_best(self) -> tuple[int, int] | None:
+        """Scan the full histories for the strongest combined reading."""
+        ts1, rssi1 = self.sensor1._ts, self.sensor1._rssi
+        ts2, rssi2 = self.sensor2._ts, self.sensor2._rssi
+
+        # Both timestamp arrays are sorted, so common timestamps are found with a single sweep
+        # that keeps the best reading so far. Going forward in time, ties keep the earliest reading.
+        best = None
+        best_key = -sys.maxsize
+        i = j = 0
+        len1, len2 = self.sensor1._n, self.sensor2._n
+        while i < len1 and j < len2:
+            t1, t2 = ts1[i], ts2[j]
+            if t1 == t2:
+                key = _signal_key(rssi1[i], rssi2[j])
+                if key > best_key:
+                    best = (t1, key)
+                    best_key = key
+                i += 1
+                j += 1
+            elif t1 < t2:
+                i += 1
+            else:
+                j += 1
+
+        return best
+
+    def _on_reading(self, sensor: Sensor, timestamp_ns: int, rssi: int) -> bool:
+        """Update the cached strongest combined reading when either sensor gets a new reading.
+
+        Returns:
+            True if the reading gives a stronger combined signal than before.
+        """
+        # Only the other sensor needs a lookup, the new reading is given
+        other_sensor = self.sensor2 if sensor is self.sensor1 else self.sensor1
+        other_rssi = other_sensor.get_rssi_at(timestamp_ns)
+        if other_rssi is None:
+            return False
+
+        key = _signal_key(rssi, other_rssi)
+        best = self._common_best
+        if best is None:
+            self._common_best = (timestamp_ns, key)
+            return True
+        if timestamp_ns == best[0] and key < best[1]:
+            # The strongest common reading was replaced by a weaker one
+            self._common_best = self._find_common_best()
+            return False
+        if key <= best[1]:
+            return False
+
+        self._common_best = (timestamp_ns, key)
+        # A better balance at equal combined strength is not a stronger signal
+        return key >> _SIGNAL_KEY_SHIFT > best[1] >> _SIGNAL_KEY_SHIFT
 
     def get_strongest_signal(self) -> SignalReading | None:
         """Get timestamp when both sensors had strongest combined signal.
@@ -113,60 +512,49 @@ class RoutePointDualSensor(RoutePoint):
         When multiple timestamps have equal combined signal strength, selects the one
         where the individual signals are most balanced (closest to each other).
         """
-        # Get timestamps where we have readings from both sensors
-        common_times = set(self.sensor1.rssi_history.keys()) & set(self.sensor2.rssi_history.keys())
-        if not common_times:
-            return None
-
-        # First find the strongest combined signal value
-        strongest_combined = max(
-            common_times,
-            key=lambda t: self.sensor1.rssi_history[t] + self.sensor2.rssi_history[t],
-        )
-        max_combined_strength = (
-            self.sensor1.rssi_history[strongest_combined] + self.sensor2.rssi_history[strongest_combined]
-        )
+        cache_key = (self.sensor1._rev, self.sensor2._rev)
+        if cache_key == self._cache_key:
+            return self._cache_value
 
-        # Find all timestamps that have this combined strength
-        strongest_times = [
-            t
-            for t in common_times
-            if (self.sensor1.rssi_history[t] + self.sensor2.rssi_history[t]) == max_combined_strength
-        ]
-
-        if len(strongest_times) == 1:
-            # If only one timestamp has max strength, return it
-            strongest_time = strongest_times[0]
+        if self._common_best is None:
+            signal = None
         else:
-            # If multiple timestamps have max strength, select the one with most balanced signals
-            strongest_time = min(
-                strongest_times, key=lambda t: abs(self.sensor1.rssi_history[t] - self.sensor2.rssi_history[t])
-            )
+            timestamp_ns, key = self._common_best
+            signal = SignalReading(timestamp_ns=timestamp_ns, strength=key >> _SIGNAL_KEY_SHIFT)
 
-        combined_signal = self.sensor1.rssi_history[strongest_time] + self.sensor2.rssi_history[strongest_time]
-        return SignalReading(timestamp=strongest_time, strength=combined_signal)
+        self._cache_key = cache_key
+        self._cache_value = signal
+        return signal
 
     def has_sensor(self, sensor: Sensor) -> bool:
         """Check if the point has a specific sensor."""
-        return sensor in (self.sensor1, self.sensor2)
+        return sensor is self.sensor1 or sensor is self.sensor2
+
 
+_strongest_signal: Final = methodcaller("get_strongest_signal")
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class RoutePassage:
     """Represents a passage through a route point.
 
     Args:
         point: The route point that was passed
-        timestamp: When the point was passed
+        timestamp_ns: When the point was passed, in nanoseconds since the epoch
         signal_strength: Signal strength at the point
     """
 
     point: RoutePoint
-    timestamp: datetime
+    timestamp_ns: int
     signal_strength: float
 
+    @property
+    def timestamp(self) -> datetime:
+        """When the point was passed."""
+        return from_ns(self.timestamp_ns)
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RouteTime:
     """Represents the timing information for a route.
 
@@ -181,32 +569,73 @@ class RouteTime:
     duration_seconds: float
 
 
-@dataclass
+@dataclass(slots=True)
 class Route:
-    """A route with start, end, and optional checkpoint points."""
+    """A route with start, end, and optional checkpoint points.
+
+    Lookups derived from the points are built once on construction, so the points
+    should not be changed afterwards.
+    """
 
     name: str
     start: RoutePoint
     end: RoutePoint
     checkpoints: list[RoutePoint] = field(default_factory=list)
+    _all_points: tuple[RoutePoint, ...] = field(default=(), init=False, repr=False)
+    _mac_to_sensor: dict[str, Sensor] = field(default_factory=dict, init=False, repr=False)
+    _known_addresses: frozenset[str] = field(default=frozenset(), init=False, repr=False)
+    _end_sensor_addresses: frozenset[str] = field(default=frozenset(), init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._all_points = (self.start, *self.checkpoints, self.end)
+
+        for point in self._all_points:
+            if isinstance(point, RoutePointDualSensor):
+                sensors = (point.sensor1, point.sensor2)
+            elif isinstance(point, RoutePointSingleSensor):
+                sensors = (point.sensor,)
+            else:
+                continue
+            for sensor in sensors:
+                self._mac_to_sensor[sensor.address] = sensor
+
+        self._known_addresses = frozenset(self._mac_to_sensor)
+        self._end_sensor_addresses = frozenset(
+            address for address, sensor in self._mac_to_sensor.items() if self.end.has_sensor(sensor)
+        )
 
-    def get_all_points(self) -> list[RoutePoint]:
+    def get_all_points(self) -> tuple[RoutePoint, ...]:
         """Get all points in order: start -> checkpoints -> end."""
-        return [self.start] + self.checkpoints + [self.end]
+        return self._all_points
 
     def get_point_passages(self) -> list[RoutePassage]:
         """Get list of points passed in chronological order with signal strengths."""
-        passages = []
-        for point in self.get_all_points():
-            signal = point.get_strongest_signal()
-            if signal:
-                passages.append(RoutePassage(point=point, timestamp=signal.timestamp, signal_strength=signal.strength))
+        return list(self.iter_point_passages())
+
+    def iter_point_passages(self) -> Iterator[RoutePassage]:
+        """Iterate points passed in chronological order with signal strengths.
+
+        Passages are taken lazily from a heap, so stopping early skips ordering the rest.
+        """
+        points = self._all_points
+        # The route order index breaks ties, so points with equal times keep their route order
+        heap = [
+            (signal.timestamp_ns, index, point, signal)
+            for index, (point, signal) in enumerate(zip(points, map(_strongest_signal, points), strict=True))
+            if signal
+        ]
+        heapify(heap)
+        while heap:
+            timestamp_ns, _, point, signal = heappop(heap)
+            yield RoutePassage(point=point, timestamp_ns=timestamp_ns, signal_strength=signal.strength)
 
-        # Sort by timestamp
-        return sorted(passages, key=lambda x: x.timestamp)
+    def is_end_sensor(self, sensor: Sensor | None) -> bool:
+        """Check if the sensor belongs to the end point, by its MAC address."""
+        return sensor is not None and sensor.address in self._end_sensor_addresses
 
-    def is_end_sensor(self, sensor: Sensor) -> bool:
-        return self.end.has_sensor(sensor)
+    def get_end_sensor_addresses(self) -> frozenset[str]:
+        """Get the MAC addresses of the end point sensors."""
+        return self._end_sensor_addresses
 
     def get_total_time(self) -> RouteTime | None:
         """Calculate total time from start to end point.
@@ -221,29 +650,30 @@ class Route:
         if not start_signal or not end_signal:
             return None
 
-        duration = (end_signal.timestamp - start_signal.timestamp).total_seconds()
+        duration = (end_signal.timestamp_ns - start_signal.timestamp_ns) / NS_PER_SECOND
 
         return RouteTime(start_time=start_signal.timestamp, end_time=end_signal.timestamp, duration_seconds=duration)
 
-    def get_mac_to_sensor_lookup(self) -> dict:
-        """Create mapping of MAC addresses to sensors for the route.
+    def get_mac_to_sensor_lookup(self) -> Mapping[str, Sensor]:
+        """Get mapping of MAC addresses to sensors for the route.
 
         Returns:
-            Dictionary mapping sensor MAC addresses to Sensor objects.
+            Read-only view mapping sensor MAC addresses to Sensor objects.
         """
-        lookup = {}
-        for point in self.get_all_points():
-            if isinstance(point, RoutePointDualSensor):
-                lookup[point.sensor1.address] = point.sensor1
-                lookup[point.sensor2.address] = point.sensor2
-            elif isinstance(point, RoutePointSingleSensor):
-                lookup[point.sensor.address] = point.sensor
-        return lookup
+        return MappingProxyType(self._mac_to_sensor)
+
+    def lookup_sensor(self, address: str) -> Sensor | None:
+        """Get the sensor with the given MAC address.
+
+        Returns:
+            Sensor of the route with the address, None if the address is unknown.
+        """
+        return self._mac_to_sensor.get(address)
 
-    def get_known_addresses(self) -> set[str]:
+    def get_known_addresses(self) -> frozenset[str]:
         """Get the set of known MAC addresses for all sensors in the route.
 
         Returns:
             Set of MAC addresses for all sensors in the route.
         """
-        return set(self.get_mac_to_sensor_lookup().keys())
+        return self._known_addresses
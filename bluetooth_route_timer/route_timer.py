@@ -2,6 +2,7 @@
 
 import asyncio
 import logging
+from typing import Final
 
 from bluetooth_route_timer.route import Route
 from bluetooth_route_timer.scanner import BluetoothScanner
@@ -10,62 +11,85 @@ from bluetooth_route_timer.scanner import BluetoothScanner
 logger = logging.getLogger(__name__)
 
 # Timer constants
-ABSOLUTE_END_TIMER_DURATION_SEC = 30
-SCAN_END_TIMER_DURATION_SEC = 15
+ABSOLUTE_END_TIMER_DURATION_SEC: Final = 30
+SCAN_END_TIMER_DURATION_SEC: Final = 15
 
 
-async def scan_loop(scanner: BluetoothScanner, route: Route) -> Route:
-    """Main scanning loop."""
-    last_end_signal = None
-    end_timer = None
-    absolute_end_timer = None
+async def scan_loop(
+    scanner: BluetoothScanner,
+    route: Route,
+    absolute_end_timer_duration: float = ABSOLUTE_END_TIMER_DURATION_SEC,
+    scan_end_timer_duration: float = SCAN_END_TIMER_DURATION_SEC,
+) -> Route:
+    """Main scanning loop.
+
+    Args:
+        scanner: Scanner providing the device readings
+        route: Route whose sensors collect the readings
+        absolute_end_timer_duration: Seconds to scan after the first end signal
+        scan_end_timer_duration: Seconds to scan after the latest strongest end signal
+    """
+    loop = asyncio.get_running_loop()
+    # Event loop times after which scanning ends
+    end_deadline: float | None = None
+    absolute_deadline: float | None = None
 
     mac_to_sensor_lookup = route.get_mac_to_sensor_lookup()
+    end_sensor_addresses = route.get_end_sensor_addresses()
+    # Bound once as it is called for every reading
+    log_info = logger.info
 
     try:
-        async for reading in scanner.scan_devices():
-            # Check if either timer has completed
-            if (end_timer and end_timer.done()) or (absolute_end_timer and absolute_end_timer.done()):
-                timer_type = "completion" if end_timer and end_timer.done() else "absolute"
-                logger.info(f"{timer_type.capitalize()} timer expired, ending scan...")
-                break
-
-            # Get sensor if this is a known device
-            sensor = mac_to_sensor_lookup.get(reading.device.address)
-            if sensor:
-                logger.info(f"Sensor {sensor.name} RSSI: {reading.rssi} dBm")
-                sensor.add_rssi(reading.rssi, reading.timestamp)
-
-                is_end_sensor = route.is_end_sensor(sensor)
-                if is_end_sensor:
-                    end_signal = route.end.get_strongest_signal()
-
-                    # Start timers if we detected possible final end signal
-                    if end_signal:
-                        # Start absolute end timer on first end signal
-                        if absolute_end_timer is None:
-                            absolute_end_timer = asyncio.create_task(asyncio.sleep(ABSOLUTE_END_TIMER_DURATION_SEC))
-                            logger.info(f"Starting {ABSOLUTE_END_TIMER_DURATION_SEC} second absolute timer...")
-
-                        if last_end_signal is None or end_signal.strength > last_end_signal.strength:
-                            last_end_signal = end_signal
-
-                            # Reset the 5-second timer on new strongest signal
-                            if end_timer is not None:
-                                end_timer.cancel()
-                            end_timer = asyncio.create_task(asyncio.sleep(SCAN_END_TIMER_DURATION_SEC))
-                            logger.info(f"Starting {SCAN_END_TIMER_DURATION_SEC} second completion timer...")
-
-            else:
-                logger.debug(f"Found unknown device: {reading.device.address}")
-
-        return route
+        # A single timeout is moved to the earlier deadline instead of running a task per timer
+        async with asyncio.timeout(None) as scan_timeout:
+            async for batch in scanner.scan_device_batches():
+                end_signal_seen = False
+                end_signal_improved = False
+
+                for reading in batch:
+                    # The scanner only passes known devices, so the lookup is expected to succeed
+                    try:
+                        sensor = mac_to_sensor_lookup[reading.device.address]
+                    except KeyError:
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Found unknown device: %s", reading.device.address)
+                        continue
+
+                    log_info("Sensor %s RSSI: %s dBm", sensor.name, reading.rssi)
+                    is_strongest = sensor.add_rssi(reading.rssi, reading.timestamp)
+                    if sensor.address in end_sensor_addresses:
+                        end_signal_seen = True
+                        if is_strongest:
+                            end_signal_improved = True
+
+                # Set deadlines once per batch if we detected possible final end signal. The first end
+                # signal of this scan starts the timers even if the route already has a stronger one.
+                if end_signal_seen and (
+                    end_signal_improved or (absolute_deadline is None and route.end.get_strongest_signal() is not None)
+                ):
+                    now = loop.time()
+
+                    # Start absolute end timer on first end signal
+                    if absolute_deadline is None:
+                        absolute_deadline = now + absolute_end_timer_duration
+                        log_info("Starting %s second absolute timer...", absolute_end_timer_duration)
+
+                    # Reset the completion timer on new strongest signal
+                    end_deadline = now + scan_end_timer_duration
+                    log_info("Starting %s second completion timer...", scan_end_timer_duration)
+
+                    scan_timeout.reschedule(min(end_deadline, absolute_deadline))
+    except TimeoutError:
+        if not scan_timeout.expired():
+            raise
     except asyncio.CancelledError:
         logger.info("Scan stopped")
         raise
     finally:
-        if end_timer:
-            end_timer.cancel()
-        if absolute_end_timer:
-            absolute_end_timer.cancel()
         await scanner.stop_scan()
+
+    if scan_timeout.expired():
+        timer_type = "completion" if end_deadline <= absolute_deadline else "absolute"
+        logger.info(f"{timer_type.capitalize()} timer expired, ending scan...")
+
+    return route
@@ -1,42 +1,58 @@
 """Bluetooth scanner module for discovering and connecting to BLE sensors."""
 
 import asyncio
-from collections.abc import AsyncGenerator
+import logging
+import sys
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Iterable, Set
+from contextlib import aclosing
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Set
+from typing import Final
 
 from bleak import BleakScanner
 from bleak.backends.device import BLEDevice
 from bleak.backends.scanner import AdvertisementData
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+# Readings kept while the consumer is busy, the oldest are dropped beyond this
+DEVICE_QUEUE_CAPACITY: Final = 1024
+
+
+@dataclass(slots=True)
 class DeviceReading:
     """Represents a single Bluetooth device reading.
 
     Args:
         device: The Bluetooth device that was detected
-        timestamp: When the device was detected
+        timestamp: When the device was detected, in nanoseconds since the epoch
         rssi: Signal strength in dBm
     """
 
     device: BLEDevice
-    timestamp: datetime
+    timestamp: int
     rssi: float
 
 
 class BluetoothScanner:
-    def __init__(self, known_addresses: Set[str]):
+    def __init__(self, known_addresses: Set[str], queue_capacity: int = DEVICE_QUEUE_CAPACITY):
         """Initialize the Bluetooth scanner.
 
         Args:
             known_addresses: Set of MAC addresses to filter devices.
                             Only devices with these addresses will be processed.
+            queue_capacity: Number of readings kept while the consumer is busy.
         """
         self._scanner: BleakScanner | None = None
-        self._device_queue: asyncio.Queue[DeviceReading] = asyncio.Queue()
-        self._known_addresses: Set[str] = known_addresses
+        # Bounded FIFO, a full queue drops the oldest reading when a new one is appended
+        self._device_queue: deque[DeviceReading] = deque(maxlen=queue_capacity)
+        self._dropped_readings = 0
+        # Set when the device queue gets new items or scanning is stopped, so the consumer waits without polling
+        self._device_available = asyncio.Event()
+        self._stop_requested = False
+        # Interned so that lookups with the same string objects are decided by identity
+        self._known_addresses: frozenset[str] = frozenset(sys.intern(address) for address in known_addresses)
 
     async def _device_found(self, device: BLEDevice, advertisement_data: AdvertisementData) -> None:
         """Process a found device.
@@ -45,12 +61,45 @@ class BluetoothScanner:
             device: The Bluetooth device that was detected
             advertisement_data: Advertisement data from the device
         """
-        # Only process devices with known MAC addresses
+        reading = self._filter_one(device, advertisement_data.rssi)
+        if reading is not None:
+            # The reading is handed over without suspending the callback
+            self._enqueue(reading)
+            self._device_available.set()
+
+    def _enqueue(self, reading: DeviceReading) -> None:
+        """Append a reading to the device queue, counting the reading dropped from a full queue."""
+        queue = self._device_queue
+        if len(queue) == queue.maxlen:
+            # Logged once per batch by the consumer instead of for every dropped reading
+            self._dropped_readings += 1
+        queue.append(reading)
+
+    def _filter_one(self, device: BLEDevice, rssi: float) -> DeviceReading | None:
+        """Create a reading of the device if its MAC address is known.
+
+        Returns:
+            The reading, or None for an unknown device.
+        """
+        # Only process devices with known MAC addresses, before doing any other work
         if device.address not in self._known_addresses:
-            return
+            return None
+        return DeviceReading(device=device, timestamp=time.time_ns(), rssi=rssi)
+
+    async def _device_found_batch(self, items: Iterable[tuple[BLEDevice, AdvertisementData]]) -> None:
+        """Process several found devices without yielding to the event loop in between.
 
-        reading = DeviceReading(device=device, timestamp=datetime.now(), rssi=advertisement_data.rssi)
-        await self._device_queue.put(reading)
+        Args:
+            items: Pairs of detected Bluetooth device and its advertisement data
+        """
+        filter_one = self._filter_one
+        enqueue = self._enqueue
+        for device, advertisement_data in items:
+            reading = filter_one(device, advertisement_data.rssi)
+            if reading is not None:
+                enqueue(reading)
+        if self._device_queue:
+            self._device_available.set()
 
     async def scan_devices(self) -> AsyncGenerator[DeviceReading, None]:
         """Scan for BLE devices and yield them as they are discovered.
@@ -59,24 +108,59 @@ class BluetoothScanner:
         Yields:
             DeviceReading objects as devices are discovered.
         """
+        async with aclosing(self.scan_device_batches()) as batches:
+            async for batch in batches:
+                for reading in batch:
+                    yield reading
+
+    async def scan_device_batches(self) -> AsyncGenerator[list[DeviceReading], None]:
+        """Scan for BLE devices and yield the readings as batches.
+        Advertisements often arrive in bursts, so each batch holds all readings that
+        were queued while the previous batch was processed.
+        Continues scanning until stop_scan() is called.
+
+        Yields:
+            Non-empty lists of DeviceReading objects in the order they were discovered.
+        """
+        self._stop_requested = False
         self._scanner = BleakScanner(detection_callback=self._device_found, cb=dict(use_bdaddr=True))
         await self._scanner.start()
+        reported_drops = self._dropped_readings
 
         try:
             while True:
-                try:
-                    # Wait for new devices with a timeout
-                    reading = await asyncio.wait_for(self._device_queue.get(), timeout=0.1)
-                    yield reading
-                except asyncio.TimeoutError:
-                    continue
-                except asyncio.CancelledError:
+                # Wait for new devices without polling, the consumer is woken up by the next reading.
+                # Cancellation is passed on to the consumer once the scanner has been stopped.
+                await self._device_available.wait()
+                self._device_available.clear()
+
+                # Take all readings that queued up meanwhile
+                stop_requested = self._stop_requested
+                batch = list(self._device_queue)
+                self._device_queue.clear()
+                if self._dropped_readings != reported_drops:
+                    logger.warning(
+                        "Device queue full, dropped %d oldest readings since the last batch",
+                        self._dropped_readings - reported_drops,
+                    )
+                    reported_drops = self._dropped_readings
+                if batch:
+                    yield batch
+                if stop_requested:
                     break
         finally:
-            await self.stop_scan()
+            await self._stop_scanner()
 
     async def stop_scan(self) -> None:
         """Stop the ongoing Bluetooth scan."""
+        if self._scanner:
+            # Wake up the consumer so that scanning finishes
+            self._stop_requested = True
+            self._device_available.set()
+            await self._stop_scanner()
+
+    async def _stop_scanner(self) -> None:
+        """Stop the BleakScanner without signaling the consumer."""
         if self._scanner:
             await self._scanner.stop()
             self._scanner = None
@@ -84,9 +168,5 @@ class BluetoothScanner:
     async def clear_devices(self) -> None:
         """Clear the device queue."""
         await self.stop_scan()
-        # Clear the queue
-        while not self._device_queue.empty():
-            try:
-                self._device_queue.get_nowait()
-            except asyncio.QueueEmpty:
-                break
+        self._device_queue.clear()
+        self._device_available.clear()
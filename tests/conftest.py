@@ -0,0 +1,39 @@
+"""Test doubles shared by the scanner tests."""
+
+from bleak.backends.device import BLEDevice
+
+# Shared by all mock devices, the scanner never changes the details
+_EMPTY_DETAILS: dict = {}
+
+
+class MockBLEDevice(BLEDevice):
+    """Mock BLE device that doesn't require all constructor arguments."""
+
+    @classmethod
+    def make(cls, address: str, name: str) -> "MockBLEDevice":
+        """Create a mock device without running the BLEDevice constructor."""
+        device = object.__new__(cls)
+        device.address = address
+        device.name = name
+        device.details = _EMPTY_DETAILS
+        return device
+
+
+class MockAdvertisementData:
+    """Mock advertisement data for testing."""
+
+    def __init__(self, rssi: float):
+        self.rssi = rssi
+
+
+class MockBleakScanner:
+    """Mock BleakScanner that does not touch the Bluetooth adapter."""
+
+    def __init__(self, *args, **kwargs):
+        self.running = False
+
+    async def start(self):
+        self.running = True
+
+    async def stop(self):
+        self.running = False
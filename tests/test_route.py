@@ -1,5 +1,6 @@
 """Tests for Route and RoutePoint classes."""
 
+from dataclasses import replace
 from datetime import datetime, timedelta
 
 import pytest
@@ -13,12 +14,13 @@ from bluetooth_route_timer.route import (
     RouteTime,
     Sensor,
     SignalReading,
+    _signal_key,
 )
 
 
-@pytest.fixture
-def sensors():
-    """Create test sensors."""
+@pytest.fixture(scope="module")
+def sensor_templates():
+    """Create test sensor templates shared by the module."""
     return {
         "start1": Sensor(name="start1", address="00:11:22:33:44:55"),
         "start2": Sensor(name="start2", address="AA:BB:CC:DD:EE:FF"),
@@ -28,6 +30,12 @@ def sensors():
     }
 
 
+@pytest.fixture
+def sensors(sensor_templates):
+    """Create test sensors with empty histories from the templates."""
+    return {key: replace(template) for key, template in sensor_templates.items()}
+
+
 @pytest.fixture
 def route(sensors):
     """Create a test route."""
@@ -351,3 +359,195 @@ def test_get_total_time_multiple_signals(route, sensors):
     assert result.start_time == reference_time
     assert result.end_time == end_time
     assert result.duration_seconds == 10.0
+
+
+def test_route_point_dual_sensor_existing_readings(sensors):
+    """Test that readings added before the point is created are taken into account."""
+    reference_time = datetime(2024, 1, 1, 12, 0, 0)
+    sensors["start1"].add_rssi(-50, reference_time)
+    sensors["start2"].add_rssi(-60, reference_time)
+
+    point = RoutePointDualSensor(
+        type=PointType.START,
+        name="start",
+        sensor1=sensors["start1"],
+        sensor2=sensors["start2"],
+    )
+
+    signal = point.get_strongest_signal()
+    assert signal.timestamp == reference_time
+    assert signal.strength == -110
+
+    # New readings are still picked up after creation
+    later_time = reference_time + timedelta(seconds=1)
+    sensors["start1"].add_rssi(-40, later_time)
+    sensors["start2"].add_rssi(-50, later_time)
+
+    signal = point.get_strongest_signal()
+    assert signal.timestamp == later_time
+    assert signal.strength == -90
+
+
+def test_route_point_dual_sensor_add_rssi_returns_strongest(sensors):
+    """Test that add_rssi reports new strongest combined readings for dual sensor points."""
+    RoutePointDualSensor(
+        type=PointType.START,
+        name="start",
+        sensor1=sensors["start1"],
+        sensor2=sensors["start2"],
+    )
+
+    reference_time = datetime(2024, 1, 1, 12, 0, 0)
+    # No common reading yet, even though it is the strongest reading of the sensor
+    assert sensors["start1"].add_rssi(-50, reference_time) is False
+    assert sensors["start2"].add_rssi(-60, reference_time) is True
+
+    later_time = reference_time + timedelta(seconds=1)
+    assert sensors["start1"].add_rssi(-40, later_time) is False
+    assert sensors["start2"].add_rssi(-80, later_time) is False
+
+
+def test_route_point_passages_out_of_route_order(route, sensors):
+    """Test that passages are sorted when points are not passed in route order."""
+    reference_time = datetime(2024, 1, 1, 12, 0, 0)
+
+    sensors["start1"].add_rssi(-50, reference_time)
+    sensors["start2"].add_rssi(-60, reference_time)
+
+    # End point passed before the checkpoint
+    end_time = reference_time + timedelta(seconds=5)
+    sensors["end1"].add_rssi(-55, end_time)
+    sensors["end2"].add_rssi(-65, end_time)
+
+    cp_time = reference_time + timedelta(seconds=10)
+    sensors["single"].add_rssi(-45, cp_time)
+
+    passages = route.get_point_passages()
+    assert [passage.point for passage in passages] == [route.start, route.end, route.checkpoints[0]]
+    assert [passage.timestamp for passage in passages] == [reference_time, end_time, cp_time]
+
+
+def test_iter_point_passages_first_passage(route, sensors):
+    """Test taking only the first passage in time."""
+    reference_time = datetime(2024, 1, 1, 12, 0, 0)
+    sensors["single"].add_rssi(-45, reference_time + timedelta(seconds=10))
+    sensors["start1"].add_rssi(-50, reference_time)
+    sensors["start2"].add_rssi(-60, reference_time)
+
+    first = next(route.iter_point_passages())
+    assert first.point is route.start
+    assert first.timestamp == reference_time
+    assert first.timestamp_ns == route.start.get_strongest_signal().timestamp_ns
+    assert len(list(route.iter_point_passages())) == 2
+
+
+def test_has_sensor_uses_identity(sensors):
+    """Test that points only match their own sensor objects."""
+    point = RoutePointSingleSensor(type=PointType.CHECKPOINT, name="test", sensor=sensors["single"])
+    lookalike = Sensor(name="single", address="CC:DD:EE:FF:00:11")
+
+    assert point.has_sensor(sensors["single"]) is True
+    assert point.has_sensor(lookalike) is False
+
+
+def test_route_point_dual_sensor_existing_readings_signal_balance(sensors):
+    """Test that the most balanced signals are selected from readings added before the point is created."""
+    reference_time = datetime(2024, 1, 1, 12, 0, 0)
+    sensors["start1"].add_rssi(-70, reference_time)  # Less balanced
+    sensors["start2"].add_rssi(-40, reference_time)
+    sensors["start1"].add_rssi(-90, reference_time + timedelta(seconds=1))  # Weaker
+    sensors["start1"].add_rssi(-50, reference_time + timedelta(seconds=2))  # More balanced
+    sensors["start2"].add_rssi(-60, reference_time + timedelta(seconds=2))
+
+    point = RoutePointDualSensor(
+        type=PointType.START,
+        name="start",
+        sensor1=sensors["start1"],
+        sensor2=sensors["start2"],
+    )
+
+    signal = point.get_strongest_signal()
+    assert signal.timestamp == reference_time + timedelta(seconds=2)
+    assert signal.strength == -110
+
+
+def test_strongest_signal_is_cached_until_new_readings(sensors):
+    """Test that the strongest signal is reused until a sensor gets a new reading."""
+    point = RoutePointSingleSensor(type=PointType.CHECKPOINT, name="test", sensor=sensors["single"])
+    reference_time = datetime(2024, 1, 1, 12, 0, 0)
+    sensors["single"].add_rssi(-50, reference_time)
+
+    signal = point.get_strongest_signal()
+    assert point.get_strongest_signal() is signal
+
+    with pytest.raises(AttributeError):
+        signal.strength = 0  # Cached readings are shared, so they must be immutable
+
+    sensors["single"].add_rssi(-40, reference_time + timedelta(seconds=1))
+    new_signal = point.get_strongest_signal()
+    assert new_signal is not signal
+    assert new_signal.strength == -40
+
+
+def test_lookup_sensor(route, sensors):
+    """Test looking up sensors by MAC address."""
+    assert route.lookup_sensor("00:11:22:33:44:55") is sensors["start1"]
+    assert route.lookup_sensor("BB:CC:DD:EE:FF:00") is sensors["end2"]
+    assert route.lookup_sensor("CC:DD:EE:FF:00:11") is sensors["single"]
+    assert route.lookup_sensor("unknown") is None
+
+
+def test_mac_to_sensor_lookup_is_read_only(route, sensors):
+    """Test that the MAC address lookup cannot be changed through the returned mapping."""
+    lookup = route.get_mac_to_sensor_lookup()
+    assert lookup["00:11:22:33:44:55"] is sensors["start1"]
+    with pytest.raises(TypeError):
+        lookup["unknown"] = sensors["single"]  # type: ignore
+    assert route.lookup_sensor("unknown") is None
+
+
+def test_signal_key_orders_by_strength_then_balance():
+    """Test that packed signal keys compare by combined strength first and balance second."""
+    assert _signal_key(-40, -60) > _signal_key(-50, -60)
+    assert _signal_key(-50, -60) > _signal_key(-40, -70)
+    assert _signal_key(-120, -10) > _signal_key(-70, -70)
+    assert _signal_key(-40, -70) >> 16 == -110
+
+
+def test_route_point_dual_sensor_add_rssi_bulk(sensors):
+    """Test that bulk readings update the strongest combined signal."""
+    point = RoutePointDualSensor(
+        type=PointType.START, name="start", sensor1=sensors["start1"], sensor2=sensors["start2"]
+    )
+    timestamps = [1_000, 2_000, 3_000]
+
+    assert sensors["start1"].add_rssi_bulk(timestamps, [-60, -40, -50]) is False
+    assert sensors["start2"].add_rssi_bulk(timestamps, [-60, -50, -40]) is True
+
+    signal = point.get_strongest_signal()
+    assert signal.timestamp_ns == 2_000
+    assert signal.strength == -90
+
+
+def test_route_point_dual_sensor_same_timestamp_replaces_reading(sensors):
+    """Test that the combined signal uses the latest reading of a sensor at a timestamp."""
+    point = RoutePointDualSensor(
+        type=PointType.START, name="start", sensor1=sensors["start1"], sensor2=sensors["start2"]
+    )
+    reference_time = datetime(2024, 1, 1, 12, 0, 0)
+    later_time = reference_time + timedelta(seconds=1)
+
+    sensors["start1"].add_rssi(-70, reference_time)
+    sensors["start1"].add_rssi(-40, reference_time)
+    sensors["start2"].add_rssi(-50, reference_time)
+    assert point.get_strongest_signal().strength == -90
+
+    sensors["start1"].add_rssi(-60, later_time)
+    sensors["start2"].add_rssi(-60, later_time)
+    assert point.get_strongest_signal().timestamp == reference_time
+
+    # The strongest reading gets weaker, so the other common reading takes over
+    sensors["start2"].add_rssi(-90, reference_time)
+    signal = point.get_strongest_signal()
+    assert signal.timestamp == later_time
+    assert signal.strength == -120
@@ -1,13 +1,21 @@
 """Tests for route scanner functionality."""
 
 import asyncio
+import time
 from collections.abc import AsyncGenerator
-from datetime import datetime, timedelta
 
 import pytest
-from bleak.backends.device import BLEDevice
-
-from bluetooth_route_timer.route import PointType, Route, RoutePointDualSensor, RouteTime, Sensor
+from conftest import MockBleakScanner, MockBLEDevice
+
+from bluetooth_route_timer.route import (
+    NS_PER_SECOND,
+    PointType,
+    Route,
+    RoutePointDualSensor,
+    RoutePointSingleSensor,
+    RouteTime,
+    Sensor,
+)
 from bluetooth_route_timer.route_timer import scan_loop
 from bluetooth_route_timer.scanner import BluetoothScanner, DeviceReading
 
@@ -37,18 +45,6 @@ TEST_ROUTE = Route(
 )
 
 
-class MockBLEDevice(BLEDevice):
-    """Mock BLE device that doesn't require all constructor arguments."""
-
-    def __init__(self, address: str, name: str):
-        super().__init__(
-            address=address,
-            name=name,
-            details={},  # Empty details for testing
-            rssi=0,  # Default RSSI, will be overridden in DeviceReading
-        )
-
-
 class MockScanner(BluetoothScanner):
     """Mock scanner that yields predefined readings."""
 
@@ -58,17 +54,20 @@ class MockScanner(BluetoothScanner):
         super().__init__(known_addresses=known_addresses)
         self.readings = readings
         self.stopped = False
+        self.started = asyncio.Event()
+        self.stop_event = asyncio.Event()
         self._scan_task: asyncio.Task | None = None
 
-    async def scan_devices(self) -> AsyncGenerator[DeviceReading, None]:
-        """Yield predefined readings until stopped."""
+    async def scan_device_batches(self) -> AsyncGenerator[list[DeviceReading], None]:
+        """Yield predefined readings one at a time until stopped."""
         try:
             for reading in self.readings:
                 if self.stopped:
                     break
-                yield reading
-                # Small delay to simulate real scanning
-                await asyncio.sleep(0.01)
+                self.started.set()
+                yield [reading]
+                # Yield to the event loop to simulate real scanning
+                await asyncio.sleep(0)
         except asyncio.CancelledError:
             self.stopped = True
             raise
@@ -78,22 +77,32 @@ class MockScanner(BluetoothScanner):
     async def stop_scan(self) -> None:
         """Mark scanner as stopped."""
         self.stopped = True
+        self.stop_event.set()
         await super().stop_scan()
 
 
+class OpenEndedMockScanner(MockScanner):
+    """Mock scanner that keeps scanning after yielding the predefined readings."""
+
+    async def scan_device_batches(self) -> AsyncGenerator[list[DeviceReading], None]:
+        async for batch in super().scan_device_batches():
+            yield batch
+        await self.stop_event.wait()
+
+
 @pytest.fixture
 def mock_readings():
     """Create test device readings."""
-    base_time = datetime.now()
+    base_time = time.time_ns()
     readings = []
 
     # Create mock BLE devices for our sensors
     devices = {
-        TEST_ROUTE.start.sensor1.address: MockBLEDevice(TEST_ROUTE.start.sensor1.address, "Start 1"),
-        TEST_ROUTE.start.sensor2.address: MockBLEDevice(TEST_ROUTE.start.sensor2.address, "Start 2"),
-        TEST_ROUTE.end.sensor1.address: MockBLEDevice(TEST_ROUTE.end.sensor1.address, "End 1"),
-        TEST_ROUTE.end.sensor2.address: MockBLEDevice(TEST_ROUTE.end.sensor2.address, "End 2"),
-        "unknown": MockBLEDevice("unknown", "Unknown Device"),
+        TEST_ROUTE.start.sensor1.address: MockBLEDevice.make(TEST_ROUTE.start.sensor1.address, "Start 1"),
+        TEST_ROUTE.start.sensor2.address: MockBLEDevice.make(TEST_ROUTE.start.sensor2.address, "Start 2"),
+        TEST_ROUTE.end.sensor1.address: MockBLEDevice.make(TEST_ROUTE.end.sensor1.address, "End 1"),
+        TEST_ROUTE.end.sensor2.address: MockBLEDevice.make(TEST_ROUTE.end.sensor2.address, "End 2"),
+        "unknown": MockBLEDevice.make("unknown", "Unknown Device"),
     }
 
     # Add start point readings (stronger signal)
@@ -105,10 +114,10 @@ def mock_readings():
     )
 
     # Add some unknown device readings
-    readings.append(DeviceReading(devices["unknown"], base_time + timedelta(seconds=1), -70))
+    readings.append(DeviceReading(devices["unknown"], base_time + NS_PER_SECOND, -70))
 
     # Add end point readings (weaker first)
-    end_time = base_time + timedelta(seconds=10)
+    end_time = base_time + 10 * NS_PER_SECOND
     readings.extend(
         [
             DeviceReading(devices[TEST_ROUTE.end.sensor1.address], end_time, -70),
@@ -117,7 +126,7 @@ def mock_readings():
     )
 
     # Add end point readings (stronger signal)
-    better_end_time = base_time + timedelta(seconds=11)
+    better_end_time = base_time + 11 * NS_PER_SECOND
     readings.extend(
         [
             DeviceReading(devices[TEST_ROUTE.end.sensor1.address], better_end_time, -45),
@@ -128,7 +137,6 @@ def mock_readings():
     return readings
 
 
-@pytest.mark.asyncio
 async def test_scan_loop_basic_functionality(mock_readings, caplog):
     """Test basic scanning functionality."""
     caplog.set_level("DEBUG")  # Lower log level to see more details
@@ -151,26 +159,20 @@ async def test_scan_loop_basic_functionality(mock_readings, caplog):
     assert total_time.duration_seconds == 11.0
 
 
-@pytest.mark.asyncio
 async def test_scan_loop_cancellation(mock_readings):
     """Test that scan loop can be cancelled."""
-    scanner = MockScanner(mock_readings)
+    scanner = OpenEndedMockScanner(mock_readings)
 
     # Create a task for the scan loop
     scan_task = asyncio.create_task(scan_loop(scanner, TEST_ROUTE))
 
-    # Let it run for a bit
-    await asyncio.sleep(0.1)
+    # Wait until scanning has started
+    await scanner.started.wait()
 
     # Cancel the task and wait for it to finish
     scan_task.cancel()
-    try:
+    with pytest.raises(asyncio.CancelledError):
         await scan_task
-    except asyncio.CancelledError:
-        pass
-
-    # Give the scanner a moment to process the cancellation
-    await asyncio.sleep(0.1)
 
     # Verify that the scanner was stopped
     assert scanner.stopped
@@ -180,7 +182,27 @@ async def test_scan_loop_cancellation(mock_readings):
         pytest.fail("Scanner should not yield any more readings after being stopped")
 
 
-@pytest.mark.asyncio
+async def test_scan_loop_cancellation_with_bluetooth_scanner(monkeypatch, caplog):
+    """Test that cancelling the scan loop stops a real BluetoothScanner and propagates the cancellation."""
+    caplog.set_level("INFO")
+    monkeypatch.setattr("bluetooth_route_timer.scanner.BleakScanner", MockBleakScanner)
+    scanner = BluetoothScanner(known_addresses=TEST_ROUTE.get_known_addresses())
+
+    scan_task = asyncio.create_task(scan_loop(scanner, TEST_ROUTE))
+    # Let the scan loop start the scanner and wait for readings
+    while scanner._scanner is None:
+        await asyncio.sleep(0)
+    bleak_scanner = scanner._scanner
+
+    scan_task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await scan_task
+
+    assert not bleak_scanner.running
+    assert scanner._scanner is None
+    assert any("Scan stopped" in record.message for record in caplog.records)
+
+
 async def test_scan_loop_unknown_devices(mock_readings, caplog):
     """Test handling of unknown devices."""
     caplog.set_level("DEBUG")
@@ -192,3 +214,51 @@ async def test_scan_loop_unknown_devices(mock_readings, caplog):
     # Check that unknown devices were logged
     unknown_logs = [record.message for record in caplog.records if "unknown" in record.message.lower()]
     assert len(unknown_logs) == 1
+
+
+async def test_scan_loop_ends_after_completion_timer(caplog):
+    """Test that scanning ends when no stronger end signal arrives before the completion timer."""
+    caplog.set_level("INFO")
+
+    route = Route(
+        name="timer_route",
+        start=RoutePointSingleSensor(type=PointType.START, name="start", sensor=Sensor("start", "00:11:22:33:44:55")),
+        end=RoutePointSingleSensor(type=PointType.END, name="end", sensor=Sensor("end", "11:22:33:44:55:66")),
+    )
+    base_time = time.time_ns()
+    readings = [
+        DeviceReading(MockBLEDevice.make("00:11:22:33:44:55", "Start"), base_time, -50),
+        DeviceReading(MockBLEDevice.make("11:22:33:44:55:66", "End"), base_time + NS_PER_SECOND, -50),
+    ]
+    scanner = OpenEndedMockScanner(readings)
+
+    finished_route = await asyncio.wait_for(scan_loop(scanner, route, scan_end_timer_duration=0.05), timeout=1)
+
+    assert finished_route.get_total_time().duration_seconds == 1.0
+    assert scanner.stopped
+    assert any("Completion timer expired" in record.message for record in caplog.records)
+
+
+async def test_scan_loop_ends_when_route_has_stronger_end_signal():
+    """Test that the timers start on the first end signal of a scan even if the route already has a stronger one."""
+    route = Route(
+        name="repeat_route",
+        start=RoutePointSingleSensor(type=PointType.START, name="start", sensor=Sensor("start", "00:11:22:33:44:55")),
+        end=RoutePointSingleSensor(type=PointType.END, name="end", sensor=Sensor("end", "11:22:33:44:55:66")),
+    )
+    base_time = time.time_ns()
+    start_device = MockBLEDevice.make("00:11:22:33:44:55", "Start")
+    end_device = MockBLEDevice.make("11:22:33:44:55:66", "End")
+    timer_durations = dict(absolute_end_timer_duration=0.1, scan_end_timer_duration=0.05)
+
+    first_scanner = OpenEndedMockScanner(
+        [DeviceReading(start_device, base_time, -50), DeviceReading(end_device, base_time + NS_PER_SECOND, -40)]
+    )
+    await asyncio.wait_for(scan_loop(first_scanner, route, **timer_durations), timeout=1)
+
+    # Weaker end signal than the one already on the route
+    second_scanner = OpenEndedMockScanner([DeviceReading(end_device, base_time + 2 * NS_PER_SECOND, -70)])
+    finished_route = await asyncio.wait_for(scan_loop(second_scanner, route, **timer_durations), timeout=1)
+
+    assert finished_route.get_total_time().duration_seconds == 1.0
+    assert second_scanner.stopped
@@ -1,77 +1,249 @@
 """Tests for the BluetoothScanner class."""
 
 import asyncio
+import random
+import time
+import timeit
 from datetime import datetime
 
 import pytest
 from bleak.backends.device import BLEDevice
 from bleak.backends.scanner import AdvertisementData
+from conftest import MockAdvertisementData, MockBleakScanner, MockBLEDevice
 
 from bluetooth_route_timer.scanner import BluetoothScanner, DeviceReading
 
 
-class MockBLEDevice(BLEDevice):
-    """Mock BLE device that doesn't require all constructor arguments."""
+@pytest.fixture(scope="module")
+def shared_scanner():
+    """Create a scanner shared by the module."""
+    return BluetoothScanner(known_addresses={"00:11:22:33:44:55", "AA:BB:CC:DD:EE:FF"})
 
-    def __init__(self, address: str, name: str):
-        super().__init__(
-            address=address,
-            name=name,
-            details={},  # Empty details for testing
-            rssi=0,  # Default RSSI, will be overridden in DeviceReading
-        )
-
-
-class MockAdvertisementData:
-    """Mock advertisement data for testing."""
 
-    def __init__(self, rssi: float):
-        self.rssi = rssi
+@pytest.fixture
+def scanner(shared_scanner):
+    """Provide the shared scanner with an empty device queue."""
+    shared_scanner._device_queue.clear()
+    # A fresh event drops any wakeup or waiter left behind by the previous test
+    shared_scanner._device_available = asyncio.Event()
+    shared_scanner._stop_requested = False
+    return shared_scanner
 
 
 class TestBluetoothScanner:
     """Tests for the BluetoothScanner class."""
 
-    @pytest.mark.asyncio
-    async def test_known_addresses_filtering(self):
-        """Test that the scanner only processes devices with known MAC addresses."""
-        # Create a queue to receive device readings
-        queue = asyncio.Queue()
-
-        # Create a set of known MAC addresses
-        known_addresses = {"00:11:22:33:44:55", "AA:BB:CC:DD:EE:FF"}
+    def test_mock_device_is_bledevice(self):
+        """Test that mock devices behave as BLE devices for the scanner."""
+        device = MockBLEDevice.make("00:11:22:33:44:55", "Known Device")
 
-        # Create a scanner with known MAC addresses
-        scanner = BluetoothScanner(known_addresses=known_addresses)
-        scanner._device_queue = queue  # Replace the queue for testing
+        assert isinstance(device, BLEDevice)
+        assert device.address == "00:11:22:33:44:55"
+        assert device.name == "Known Device"
+        assert device.details == {}
 
+    def test_known_addresses_filtering(self, scanner):
+        """Test that the scanner only processes devices with known MAC addresses."""
         # Create mock device readings
-        known_device1 = MockBLEDevice("00:11:22:33:44:55", "Known Device 1")
-        known_device2 = MockBLEDevice("AA:BB:CC:DD:EE:FF", "Known Device 2")
-        unknown_device = MockBLEDevice("11:22:33:44:55:66", "Unknown Device")
-
-        # Simulate device detection callbacks
-        await scanner._device_found(known_device1, advertisement_data=MockAdvertisementData(rssi=-50))
-        await scanner._device_found(unknown_device, advertisement_data=MockAdvertisementData(rssi=-60))
-        await scanner._device_found(known_device2, advertisement_data=MockAdvertisementData(rssi=-70))
+        known_device1 = MockBLEDevice.make("00:11:22:33:44:55", "Known Device 1")
+        known_device2 = MockBLEDevice.make("AA:BB:CC:DD:EE:FF", "Known Device 2")
+        unknown_device = MockBLEDevice.make("11:22:33:44:55:66", "Unknown Device")
 
-        # Check that only known devices were added to the queue
-        assert queue.qsize() == 2
+        # Simulate device detections
+        reading1 = scanner._filter_one(known_device1, -50)
+        unknown_reading = scanner._filter_one(unknown_device, -60)
+        reading2 = scanner._filter_one(known_device2, -70)
 
-        # Check that the first device is the first known device
-        reading1 = queue.get_nowait()
+        # Check the first known device
         assert reading1.device.address == "00:11:22:33:44:55"
         assert reading1.rssi == -50
+        assert isinstance(reading1.timestamp, int)
+
+        # Check that the unknown device was filtered out
+        assert unknown_reading is None
 
-        # Check that the second device is the second known device
-        reading2 = queue.get_nowait()
+        # Check the second known device
         assert reading2.device.address == "AA:BB:CC:DD:EE:FF"
         assert reading2.rssi == -70
 
-        # Check that the queue is empty (unknown device was filtered out)
-        assert queue.empty()
+        # Filtering does not queue anything by itself
+        assert not scanner._device_queue
+
+    async def test_device_found_batch(self, scanner):
+        """Test that a burst of detections queues only the known devices, in order."""
+        items = [
+            (MockBLEDevice.make("00:11:22:33:44:55", "Known Device 1"), MockAdvertisementData(rssi=-50)),
+            (MockBLEDevice.make("11:22:33:44:55:66", "Unknown Device"), MockAdvertisementData(rssi=-60)),
+            (MockBLEDevice.make("AA:BB:CC:DD:EE:FF", "Known Device 2"), MockAdvertisementData(rssi=-70)),
+        ]
+
+        await scanner._device_found_batch(items)
+
+        readings = list(scanner._device_queue)
+        assert [(reading.device.address, reading.rssi) for reading in readings] == [
+            ("00:11:22:33:44:55", -50),
+            ("AA:BB:CC:DD:EE:FF", -70),
+        ]
+
+    async def test_queue_is_fifo_under_burst(self, scanner):
+        """Test that readings queued in a burst come out in order after a single wakeup."""
+        device = MockBLEDevice.make("00:11:22:33:44:55", "Known Device")
+
+        for i in range(1000):
+            await scanner._device_found(device, advertisement_data=MockAdvertisementData(rssi=-(i % 128)))
+
+        await asyncio.wait_for(scanner._device_available.wait(), timeout=1)
+        assert [reading.rssi for reading in scanner._device_queue] == [-(i % 128) for i in range(1000)]
+
+    async def test_device_found_single(self, scanner):
+        """Test that the detection callback queues a single known device."""
+
+        await scanner._device_found(
+            MockBLEDevice.make("00:11:22:33:44:55", "Known Device"), advertisement_data=MockAdvertisementData(rssi=-50)
+        )
+        await scanner._device_found(
+            MockBLEDevice.make("11:22:33:44:55:66", "Unknown Device"),
+            advertisement_data=MockAdvertisementData(rssi=-60),
+        )
+
+        assert len(scanner._device_queue) == 1
+        reading = scanner._device_queue.popleft()
+        assert reading.device.address == "00:11:22:33:44:55"
+        assert reading.rssi == -50
+
+    async def test_device_found_with_many_known_addresses(self):
+        """Test that filtering stays fast when the scanner knows many addresses."""
+        known_addresses = {f"00:11:22:{i >> 16 & 0xFF:02X}:{i >> 8 & 0xFF:02X}:{i & 0xFF:02X}" for i in range(10_000)}
+        scanner = BluetoothScanner(known_addresses=known_addresses)
+        assert isinstance(scanner._known_addresses, frozenset)
+
+        unknown_device = MockBLEDevice.make("AA:BB:CC:DD:EE:FF", "Unknown Device")
+        advertisement_data = MockAdvertisementData(rssi=-50)
+        call_count = 1_000
+        start = time.perf_counter_ns()
+        for _ in range(call_count):
+            await scanner._device_found(unknown_device, advertisement_data)
+        elapsed_per_call = (time.perf_counter_ns() - start) / call_count
+
+        # Generous budget, a hashed lookup takes well under a microsecond
+        assert elapsed_per_call < 50_000
+        assert not scanner._device_queue
+
+    async def test_device_found_throughput(self):
+        """Test filtering throughput with mostly unknown devices, as in a busy radio environment."""
+        addresses = [":".join(f"{i:012x}"[j : j + 2] for j in range(0, 12, 2)) for i in range(10_000)]
+        known_addresses = set(random.Random(0).sample(addresses, len(addresses) // 20))
+        scanner = BluetoothScanner(known_addresses=known_addresses)
+        devices = [MockBLEDevice.make(address, "Device") for address in addresses] * 10
+        advertisement_data = MockAdvertisementData(rssi=-60)
+
+        start = time.perf_counter_ns()
+        for device in devices:
+            await scanner._device_found(device, advertisement_data)
+        elapsed_per_call = (time.perf_counter_ns() - start) / len(devices)
+        assert elapsed_per_call < 20_000
+
+        # Without the coroutine overhead
+        accepted = 0
+        start = time.perf_counter_ns()
+        for device in devices:
+            accepted += scanner._filter_one(device, -60) is not None
+        elapsed_per_call = (time.perf_counter_ns() - start) / len(devices)
+        assert elapsed_per_call < 20_000
+        assert accepted == len(devices) // 20
+
+    def test_filter_is_constant_time(self):
+        """Test that filtering takes about the same time for few and for many known addresses."""
+        times = {}
+        for size in (10, 1_000, 100_000):
+            known_addresses = {":".join(f"{i:012x}"[j : j + 2] for j in range(0, 12, 2)) for i in range(size)}
+            scanner = BluetoothScanner(known_addresses=known_addresses)
+            known_device = MockBLEDevice.make(next(iter(known_addresses)), "Known Device")
+            unknown_device = MockBLEDevice.make("ff:ff:ff:ff:ff:ff", "Unknown Device")
+
+            def filter_devices(scanner=scanner, known_device=known_device, unknown_device=unknown_device):
+                scanner._filter_one(known_device, -50)
+                scanner._filter_one(unknown_device, -50)
+
+            times[size] = min(timeit.repeat(filter_devices, number=1_000, repeat=5))
+
+        # A linear scan would be thousands of times slower for the largest set
+        assert times[100_000] < 2 * times[10]
+
+    async def test_known_addresses_are_copied(self):
+        """Test that changing the given set afterwards does not affect filtering."""
+        known_addresses = {"00:11:22:33:44:55"}
+        scanner = BluetoothScanner(known_addresses=known_addresses)
+        known_addresses.add("AA:BB:CC:DD:EE:FF")
+
+        await scanner._device_found(
+            MockBLEDevice.make("AA:BB:CC:DD:EE:FF", "Added Later"), advertisement_data=MockAdvertisementData(rssi=-50)
+        )
+        assert not scanner._device_queue
+
+    async def test_stop_scan_ends_scan_devices(self, scanner, monkeypatch):
+        """Test that stop_scan() finishes a running scan_devices() iteration."""
+        monkeypatch.setattr("bluetooth_route_timer.scanner.BleakScanner", MockBleakScanner)
+
+        async def collect():
+            return [reading async for reading in scanner.scan_devices()]
+
+        collect_task = asyncio.create_task(collect())
+        await asyncio.sleep(0)
+
+        await scanner._device_found(
+            MockBLEDevice.make("00:11:22:33:44:55", "Known Device"), advertisement_data=MockAdvertisementData(rssi=-50)
+        )
+        await scanner.stop_scan()
+
+        readings = await asyncio.wait_for(collect_task, timeout=1)
+        assert [reading.rssi for reading in readings] == [-50]
+        assert not scanner._device_queue
+
+    async def test_scan_device_batches_drains_queued_readings(self, scanner, monkeypatch):
+        """Test that readings queued while the consumer was busy are yielded as one batch."""
+        monkeypatch.setattr("bluetooth_route_timer.scanner.BleakScanner", MockBleakScanner)
+        device = MockBLEDevice.make("00:11:22:33:44:55", "Known Device")
+
+        async def collect():
+            return [batch async for batch in scanner.scan_device_batches()]
+
+        collect_task = asyncio.create_task(collect())
+        await asyncio.sleep(0)
+
+        for rssi in (-50, -60, -70):
+            await scanner._device_found(device, advertisement_data=MockAdvertisementData(rssi=rssi))
+        await scanner.stop_scan()
+
+        batches = await asyncio.wait_for(collect_task, timeout=1)
+        assert [[reading.rssi for reading in batch] for batch in batches] == [[-50, -60, -70]]
+
+    async def test_full_device_queue_keeps_newest_readings(self, monkeypatch, caplog):
+        """Test that readings beyond the queue capacity replace the oldest ones, and that the drops are logged."""
+        monkeypatch.setattr("bluetooth_route_timer.scanner.BleakScanner", MockBleakScanner)
+        scanner = BluetoothScanner(known_addresses={"00:11:22:33:44:55"}, queue_capacity=20)
+        device = MockBLEDevice.make("00:11:22:33:44:55", "Known Device")
+
+        async def collect():
+            return [batch async for batch in scanner.scan_device_batches()]
+
+        collect_task = asyncio.create_task(collect())
+        await asyncio.sleep(0)
+
+        await scanner._device_found_batch([(device, MockAdvertisementData(rssi=-rssi)) for rssi in range(25)])
+        await scanner.stop_scan()
+
+        batches = await asyncio.wait_for(collect_task, timeout=1)
+        assert [[reading.rssi for reading in batch] for batch in batches] == [[-rssi for rssi in range(5, 25)]]
+        assert scanner._dropped_readings == 5
+        drop_messages = [record.message for record in caplog.records if "Device queue full" in record.message]
+        assert drop_messages == ["Device queue full, dropped 5 oldest readings since the last batch"]
+
+        # The single detection callback counts drops as well
+        for rssi in range(21):
+            await scanner._device_found(device, MockAdvertisementData(rssi=-rssi))
+        assert scanner._dropped_readings == 6
 
-    @pytest.mark.asyncio
     async def test_scanner_requires_known_addresses(self):
         """Test that the scanner requires known_addresses parameter."""
         # Verify that creating a scanner without known_addresses raises an error
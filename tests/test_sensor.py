@@ -1,10 +1,12 @@
 """Tests for Sensor class."""
 
-from datetime import datetime
+import math
+import sys
+from datetime import datetime, timedelta, timezone
 
 import pytest
 
-from bluetooth_route_timer.route import Sensor
+from bluetooth_route_timer.route import INITIAL_HISTORY_CAPACITY, NS_PER_SECOND, Sensor, from_ns, to_ns
 
 
 @pytest.fixture
@@ -20,15 +22,227 @@ def test_sensor_creation(sensor):
     assert sensor.rssi_history == {}
 
 
-def test_add_rssi(sensor):
-    """Test adding RSSI values."""
+@pytest.mark.parametrize(
+    ("add", "uses_given_time"),
+    [
+        pytest.param(lambda sensor, now: sensor.add_rssi(-50, now), True, id="datetime"),
+        pytest.param(lambda sensor, now: sensor.add_rssi(-50, to_ns(now)), True, id="ns"),
+        pytest.param(lambda sensor, now: sensor.add_rssi_bulk([to_ns(now)], [-50]), True, id="bulk"),
+        pytest.param(lambda sensor, now: sensor.add_rssi_now(-50), False, id="now"),
+    ],
+)
+def test_add_rssi(sensor, add, uses_given_time):
+    """Test adding a single RSSI value."""
     now = datetime.now()
-    sensor.add_rssi(-50, now)
+    assert add(sensor, now) is True
+
+    assert len(sensor.rssi_history) == 1
+    assert list(sensor.rssi_history.values())[0] == -50
+    if uses_given_time:
+        assert sensor.rssi_history[now] == -50
+
+
+def test_add_rssi_bulk_beyond_initial_capacity(sensor):
+    """Test that a large batch is copied into the buffers at once."""
+    reading_count = INITIAL_HISTORY_CAPACITY + 1000
+    sensor.add_rssi_bulk(range(reading_count), [-50] * reading_count)
+
+    assert sensor._n == reading_count
+    assert sensor._rev == 1
+    assert min(sensor._rssi[:reading_count]) == max(sensor._rssi[:reading_count]) == -50
+    assert sensor.get_rssi_at(reading_count - 1) == -50
+
+
+def test_add_rssi_now_timestamps(sensor):
+    """Test that readings added with the current time are stored as increasing ns timestamps."""
+    before = datetime.now()
+    sensor.add_rssi_now(-50)
+    sensor.add_rssi_now(-50)
+    after = datetime.now()
+
+    first, second = sensor._ts[0], sensor._ts[1]
+    assert isinstance(first, int)
+    assert first <= second
+    assert to_ns(before) <= first and second <= to_ns(after) + 1000
+
+
+def test_get_rssi_at(sensor):
+    """Test looking up a reading by timestamp."""
+    first = datetime(2024, 1, 1, 12, 0, 0)
+    second = datetime(2024, 1, 1, 12, 0, 1, 500)
+    sensor.add_rssi(-50, first)
+    sensor.add_rssi(-60, second)
+
+    assert sensor.get_rssi_at(to_ns(first)) == -50
+    assert sensor.get_rssi_at(to_ns(second)) == -60
+    assert sensor.get_rssi_at(to_ns(second) + 1) is None
+    assert list(sensor.rssi_history) == [first, second]
+
+
+def test_add_rssi_returns_strongest(sensor):
+    """Test that add_rssi reports new strongest readings."""
+    reference_time = datetime(2024, 1, 1, 12, 0, 0)
+    assert sensor.add_rssi(-60, reference_time) is True
+    assert sensor.add_rssi(-70, reference_time + timedelta(seconds=1)) is False
+    assert sensor.add_rssi(-60, reference_time + timedelta(seconds=2)) is False
+    assert sensor.add_rssi(-50, reference_time + timedelta(seconds=3)) is True
+
+
+def test_add_rssi_with_ns_timestamp(sensor):
+    """Test adding RSSI values with a timestamp in nanoseconds."""
+    now = datetime(2024, 1, 1, 12, 0, 0, 250)
+    sensor.add_rssi(-50, to_ns(now))
     assert sensor.rssi_history[now] == -50
 
 
-def test_add_rssi_without_timestamp(sensor):
-    """Test adding RSSI values without timestamp."""
-    sensor.add_rssi(-50)
+def test_add_rssi_beyond_initial_capacity(sensor):
+    """Test that the reading buffers grow when the initial capacity is used up."""
+    reading_count = INITIAL_HISTORY_CAPACITY + 10
+    for i in range(reading_count):
+        sensor.add_rssi(-50 - i % 40, i * NS_PER_SECOND)
+
+    assert len(sensor.rssi_history) == reading_count
+    assert sensor.get_rssi_at((reading_count - 1) * NS_PER_SECOND) == -50 - (reading_count - 1) % 40
+
+
+@pytest.mark.parametrize("max_history", [1, 10, 3000, INITIAL_HISTORY_CAPACITY])
+def test_max_history_drops_old_readings(max_history):
+    """Test that a sensor with max_history keeps the newest readings and the strongest signal."""
+    sensor = Sensor(name="bounded", address="00:11:22:33:44:55", max_history=max_history)
+    sensor.add_rssi(-30, 0)  # Strongest, dropped later
+    reading_count = 3 * max_history + 1
+    for i in range(1, reading_count):
+        sensor.add_rssi(-60, i * NS_PER_SECOND)
+
+    history = sensor.rssi_history
+    assert max_history <= len(history) <= 2 * max_history
+    assert len(sensor._ts) <= 2 * max_history
+    assert list(history)[-1] == from_ns((reading_count - 1) * NS_PER_SECOND)
+    assert sensor.get_rssi_at(0) is None
+    assert sensor._best_ts == 0
+    assert sensor._best_rssi == -30
+
+
+@pytest.mark.parametrize("max_history", [0, -1])
+def test_max_history_must_be_positive(max_history):
+    """Test that a sensor must keep at least one reading."""
+    with pytest.raises(ValueError):
+        Sensor(name="bounded", address="00:11:22:33:44:55", max_history=max_history)
+
+
+def test_add_rssi_out_of_order(sensor):
+    """Test that readings added out of chronological order are kept sorted."""
+    reference_time = datetime(2024, 1, 1, 12, 0, 0)
+    sensor.add_rssi(-50, reference_time + timedelta(seconds=2))
+    sensor.add_rssi(-60, reference_time)
+    sensor.add_rssi(-70, reference_time + timedelta(seconds=1))
+    sensor.add_rssi(-80, reference_time + timedelta(seconds=3))
+
+    assert list(sensor.rssi_history.values()) == [-60, -70, -50, -80]
+    assert sensor.get_rssi_at(to_ns(reference_time)) == -60
+    assert sensor.get_rssi_at(to_ns(reference_time + timedelta(seconds=1))) == -70
+    assert sensor.get_rssi_at(to_ns(reference_time + timedelta(seconds=2))) == -50
+
+
+def test_sensor_address_is_interned():
+    """Test that sensor addresses are interned."""
+    address = "".join(["00:11:22", ":33:44:55"])
+    sensor = Sensor(name="interned", address=address)
+
+    assert sensor.address is sys.intern("00:11:22:33:44:55")
+
+
+def test_smoothed_rssi(sensor):
+    """Test that smoothing weights readings by the time between them."""
+    assert len(sensor.smoothed_rssi(1.0)) == 0
+
+    sensor.add_rssi(-80, 0)
+    sensor.add_rssi(-40, NS_PER_SECOND)  # One time constant later
+    sensor.add_rssi(-40, 100 * NS_PER_SECOND)  # Long gap, follows the reading
+
+    smoothed = sensor.smoothed_rssi(1.0)
+    assert smoothed[0] == -80
+    assert smoothed[1] == pytest.approx(-80 * math.exp(-1) - 40 * (1 - math.exp(-1)))
+    assert smoothed[2] == pytest.approx(-40)
+    with pytest.raises(ValueError):
+        sensor.smoothed_rssi(0)
+
+
+def test_add_rssi_bulk(sensor):
+    """Test adding several readings at once, in and out of chronological order."""
+    assert sensor.add_rssi_bulk([], []) is False
+    assert sensor.add_rssi_bulk([NS_PER_SECOND, 2 * NS_PER_SECOND], [-60, -50.4]) is True
+    assert sensor.add_rssi_bulk([3 * NS_PER_SECOND], [-70]) is False
+    assert sensor.add_rssi_bulk([4 * NS_PER_SECOND, 0], [-80, -40]) is True
+
+    assert list(sensor.rssi_history.values()) == [-40, -60, -50, -70, -80]
+    assert sensor.get_rssi_at(2 * NS_PER_SECOND) == -50
+    assert sensor._best_ts == 0
+
+    with pytest.raises(ValueError):
+        sensor.add_rssi_bulk([5 * NS_PER_SECOND], [])
+
+
+def test_rssi_history_storage(sensor):
+    """Test that readings are stored compactly and the history is read-only."""
+    assert sensor._ts.typecode == "q"
+    assert sensor._rssi.typecode == "b"
+
+    reading_count = 100_000
+    for i in range(reading_count):
+        sensor.add_rssi(-128 + i % 148, i)
+
+    # Buffers at most double, so each reading takes at most twice its 9 bytes
+    assert len(sensor._ts) * sensor._ts.itemsize + len(sensor._rssi) * sensor._rssi.itemsize <= 2 * 9 * reading_count
+    with pytest.raises(TypeError):
+        sensor.rssi_history[datetime.now()] = -50
+
+
+def test_add_rssi_same_timestamp_replaces_reading(sensor):
+    """Test that a reading with the timestamp of an earlier one replaces it."""
+    reference_time = datetime(2024, 1, 1, 12, 0, 0)
+    later_time = reference_time + timedelta(seconds=1)
+    sensor.add_rssi(-60, reference_time)
+    sensor.add_rssi(-70, later_time)
+
+    # Stronger replacement of an older reading
+    assert sensor.add_rssi(-40, reference_time) is True
+    assert sensor.rssi_history == {reference_time: -40, later_time: -70}
+    assert sensor.get_rssi_at(to_ns(reference_time)) == -40
+    assert sensor._best_rssi == -40
+
+    # Weaker replacement of the strongest reading
+    assert sensor.add_rssi(-80, reference_time) is False
+    assert sensor.rssi_history == {reference_time: -80, later_time: -70}
+    assert (sensor._best_ts, sensor._best_rssi) == (to_ns(later_time), -70)
+
+    # Replacement of the newest reading through the bulk path
+    sensor.add_rssi_bulk([to_ns(later_time)], [-90])
+    assert sensor.rssi_history == {reference_time: -80, later_time: -90}
+    assert (sensor._best_ts, sensor._best_rssi) == (to_ns(reference_time), -80)
+
+
+def test_add_rssi_rejects_timezone_aware_datetime(sensor):
+    """Test that timestamps are naive local datetimes, which come back unchanged."""
+    naive_time = datetime(2024, 1, 1, 12, 0, 0, 123456)
+    sensor.add_rssi(-50, naive_time)
+    assert naive_time in sensor.rssi_history
+
+    with pytest.raises(ValueError):
+        sensor.add_rssi(-50, datetime(2024, 1, 1, 12, 0, 1, tzinfo=timezone.utc))
     assert len(sensor.rssi_history) == 1
-    assert list(sensor.rssi_history.values())[0] == -50
+
+
+def test_add_rssi_out_of_range_keeps_history(sensor):
+    """Test that an RSSI value outside the stored range is rejected without changing the history."""
+    sensor.add_rssi(-50, 10)
+    sensor.add_rssi(-60, 20)
+
+    with pytest.raises(ValueError):
+        sensor.add_rssi(-300, 15)
+    with pytest.raises(ValueError):
+        sensor.add_rssi_bulk([5, 30], [-40, 200])
+
+    assert [sensor._ts[i] for i in range(sensor._n)] == [10, 20]
+    assert [sensor._rssi[i] for i in range(sensor._n)] == [-50, -60]
+    assert sensor._rev == 2